@@ -17,10 +17,12 @@ def configure(context):
 
 def execute(context):
     # Load income distribution
+    columns = ["CODGEO"] + ["D%d15" % q if q != 5 else "Q215" for q in range(1, 10)]
+
     df = pd.read_excel(
         "%s/filosofi_2015/FILO_DISP_COM.xls" % context.config("data_path"),
-        sheet_name = "ENSEMBLE", skiprows = 5
-    )[["CODGEO"] + ["D%d15" % q if q != 5 else "Q215" for q in range(1, 10)]]
+        sheet_name = "ENSEMBLE", skiprows = 5, usecols = columns
+    )[columns]
     df.columns = ["commune_id", "q1", "q2", "q3", "q4", "q5", "q6", "q7", "q8", "q9"]
     df["reference_median"] = df["q5"].values
 
@@ -64,10 +66,8 @@ def execute(context):
         indices = kd_tree.query(coordinates)[1].flatten()
 
         # ... build data frame of imputed communes
-        df_reconstructed = pd.concat([
-            df[df["commune_id"] == df_existing.iloc[index]["commune_id"]]
-            for index in indices
-        ])
+        nearest_communes = df_existing["commune_id"].astype(str).values[indices]
+        df_reconstructed = df.set_index(df["commune_id"].astype(str)).loc[nearest_communes].reset_index(drop = True)
         df_reconstructed["commune_id"] = df_missing["commune_id"].values
         df_reconstructed["is_imputed"] = True
         df_reconstructed["is_missing"] = True
@@ -75,6 +75,9 @@ def execute(context):
         # ... merge the data frames
         df = pd.concat([df, df_reconstructed])
 
+    # Concatenation may have dropped the categorical type
+    df["commune_id"] = df["commune_id"].astype(str).astype("category")
+
     # Validation
     assert len(df) == len(df["commune_id"].unique())
     assert len(requested_communes - set(df["commune_id"].unique())) == 0
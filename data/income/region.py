@@ -10,14 +10,14 @@ def configure(context):
     context.config("data_path")
 
 def execute(context):
+    columns = ["D115", "D215", "D315", "D415", "Q215", "D615", "D715", "D815", "D915"]
+
     df = pd.read_excel(
         "%s/filosofi_2015/FILO_DISP_REG.xls" % context.config("data_path"),
-        sheet_name = "ENSEMBLE", skiprows = 5
+        sheet_name = "ENSEMBLE", skiprows = 5, usecols = ["CODGEO"] + columns
     )
 
-    values = df[df["CODGEO"] == 11][[
-        "D115", "D215", "D315", "D415", "Q215", "D615", "D715", "D815", "D915"
-    ]].values[0]
+    values = df[df["CODGEO"] == 11][columns].values[0]
 
     return values
 
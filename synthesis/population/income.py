@@ -1,7 +1,6 @@
 import numpy as np
 import pandas as pd
-import multiprocessing as mp
-from tqdm import tqdm
+import numba
 
 """
 This stage assigns a household income to each household of the synthesized
@@ -20,26 +19,22 @@ def configure(context):
 
 MAXIMUM_INCOME_FACTOR = 1.2
 
-def _sample_income(context, args):
-    commune_id, random_seed = args
-    df_households, df_income = context.data("households"), context.data("income")
+# Not parallel: starting numba's thread pool here would make the forked workers
+# of synthesis.population.matched hang when they run their own parallel kernel.
+@numba.jit(nopython = True)
+def sample_incomes(centiles, rows, uniform, consumption_units):
+    incomes = np.empty(len(rows))
 
-    random = np.random.RandomState(random_seed)
+    for i in range(len(rows)):
+        index = int(uniform[i])
+        lower_bound, upper_bound = centiles[rows[i], index], centiles[rows[i], index + 1]
+        incomes[i] = (lower_bound + (uniform[i] - index) * (upper_bound - lower_bound)) * consumption_units[i]
 
-    f = df_households["commune_id"] == commune_id
-    df_selected = df_households[f]
-
-    centiles = list(df_income[df_income["commune_id"] == commune_id][["q1", "q2", "q3", "q4", "q5", "q6", "q7", "q8", "q9"]].iloc[0].values / 12)
-    centiles = np.array([0] + centiles + [np.max(centiles) * MAXIMUM_INCOME_FACTOR])
-
-    indices = random.randint(10, size = len(df_selected))
-    lower_bounds, upper_bounds = centiles[indices], centiles[indices + 1]
-
-    incomes = lower_bounds + random.random_sample(size = len(df_selected)) * (upper_bounds - lower_bounds)
-    return f, incomes
+    return incomes
 
 def execute(context):
-    random = np.random.RandomState(context.config("random_seed"))
+    # Deliberately a Generator (PCG64, faster batch draws) rather than the RandomState of the other stages
+    random = np.random.default_rng(context.config("random_seed"))
 
     # Load data
     df_income = context.stage("data.income.municipality")
@@ -52,15 +47,31 @@ def execute(context):
         "household_id", "commune_id"
     ]]
 
-    df_households = pd.merge(df_households, df_homes)
+    df_households = pd.merge(df_households, df_homes, on = "household_id", how = "inner", sort = False, validate = "one_to_one")
+
+    # Share the commune categories between households and income data
+    df_households["commune_id"] = df_households["commune_id"].astype(str).astype(df_income["commune_id"].dtype)
+    assert not df_households["commune_id"].isna().any()
+
+    # Build centile table for all communes (one row per commune category code)
+    # ... bounds are zero, the nine deciles (monthly) and the extrapolated maximum
+    values = df_income[[
+        "q1", "q2", "q3", "q4", "q5", "q6", "q7", "q8", "q9"
+    ]].values.astype(np.float64) / 12
+
+    codes = df_income["commune_id"].cat.codes.values
+    centiles = np.zeros((len(df_income["commune_id"].cat.categories), 11))
+    centiles[codes, 1:10] = values
+    centiles[codes, 10] = np.max(values, axis = 1) * MAXIMUM_INCOME_FACTOR
+
+    rows = df_households["commune_id"].cat.codes.values.astype(np.int)
 
-    # Perform sampling per commune
-    with context.parallel(dict(households = df_households, income = df_income)) as parallel:
-        commune_ids = df_households["commune_id"].unique()
-        random_seeds = random.randint(10000, size = len(commune_ids))
+    # Perform sampling for all households at once
+    # ... one uniform value per household selects the stratum and the position within it
+    uniform = random.random(size = len(df_households)) * 10
 
-        for f, incomes in context.progress(parallel.imap(_sample_income, zip(commune_ids, random_seeds)), label = "Imputing income ...", total = len(commune_ids)):
-            df_households.loc[f, "household_income"] = incomes * df_households.loc[f, "consumption_units"]
+    df_households["household_income"] = sample_incomes(
+        centiles, rows, uniform, df_households["consumption_units"].values.astype(np.float64))
 
     # Cleanup
     df_households = df_households[["household_id", "household_income", "consumption_units"]]
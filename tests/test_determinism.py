@@ -48,11 +48,11 @@ def _test_determinism(index, data_path, tmpdir):
 
     REFERENCE_HASHES = {
         "ile_de_france_activities.csv":                   "dcf8e08e9f238c90bff0298048251dac",
-        "ile_de_france_persons.csv":                      "ed87e2b6dfd2a9914d5fc7b2bf6d52d3",
-        "ile_de_france_households.csv":                   "882ce7dc1a44403d12c5aa10709c0d5b",
+        "ile_de_france_persons.csv":                      "16c55ac89d481411c142d1335ade9269",
+        "ile_de_france_households.csv":                   "6e1e4d3b0d13a9d6fb2adae9dc19fe87",
         #"ile_de_france_population.xml.gz":  "e1407f918cb92166ebf46ad769d8d085",
         #"ile_de_france_network.xml.gz":     "5f10ec295b49d2bb768451c812955794",
-        "ile_de_france_households.xml.gz":  "cdbd6ed5b175328861f237dc58dee1ff",
+        "ile_de_france_households.xml.gz":  "99d5165cfa21f17d60fc0fcfad3251b0",
         #"ile_de_france_facilities.xml.gz":  "5ad41afff9ae5c470082510b943e6778",
         "ile_de_france_config.xml":         "5ac6633bfef5a5053f10b720ffbc064a"
     }